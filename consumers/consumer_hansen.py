@@ -2,7 +2,16 @@
 
 Has the following functions:
 - init_db(config): Initialize the SQLite database and create the 'streamed_messages' table if it doesn't exist.
-- insert_message(message, config): Insert a single processed message into the SQLite database.
+- read_message(): Read the latest message from the live data file.
+- read_new_messages(json_file): Return the messages appended to the live data file since the last call.
+- read_author_sentiment(conn): Return message count and average sentiment per author from the database.
+- consume_messages(json_file, stop_event): Copy new messages into the database until stopped.
+- update_visualization(): Show a live bar chart of average sentiment by author.
+- process_messages(messages): Insert messages, committing once per BATCH_SIZE messages.
+- process_messages_bulk(rows): Insert messages in one transaction with multi-row INSERT statements.
+- process_message(message): Queue a single message and flush the queue on a size/time threshold.
+- flush_messages(): Insert any queued messages into the SQLite database.
+- close_db(): Flush queued messages and close the shared connection (runs at exit).
 
 Example JSON message
 {
@@ -22,14 +31,18 @@ Example JSON message
 #####################################
 
 # import from standard library
+import atexit
+import operator
 import os
 import pathlib
 import sqlite3
+import threading
 import json
-from collections import defaultdict
-from datetime import datetime
+import time
+from collections import deque
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+from matplotlib.patches import Rectangle
 
 # import from local modules
 import utils.utils_config as config
@@ -44,12 +57,72 @@ PROJECT_ROOT = pathlib.Path(__file__).parent.parent
 DATA_FILE = PROJECT_ROOT.joinpath("data", "project_live.json")
 DB_PATH = PROJECT_ROOT.joinpath("project_db.sqlite")
 
-# Initialize a dictionary to store year, population, year counts, and average population
-message_count = defaultdict(int)    # for storing message count by author
-sentiment_avg = defaultdict(int)    # for average sentiment
+# Bytes read from the end of DATA_FILE when looking for the latest message
+TAIL_BYTES = 8192
+
+#####################################
+# Define Batching Settings
+#####################################
 
-count_messages = []
-average_sentiment = []
+# Commit once per BATCH_SIZE messages instead of once per message
+BATCH_SIZE = 500
+
+# Flush queued messages at least this often, even if the batch isn't full
+FLUSH_INTERVAL_SECS = 2.0
+
+# One connection for the life of the consumer (opened once at startup).
+# isolation_level=None leaves transaction control to the explicit BEGIN/COMMIT below.
+# Each multi-row INSERT size is its own statement, so keep more of them prepared.
+_CONN = sqlite3.connect(
+    str(DB_PATH),
+    isolation_level=None,
+    check_same_thread=False,
+    cached_statements=256,
+)
+
+# These PRAGMAs are per-connection, so they are set on the connection that
+# does the inserts. journal_mode=WAL persists in the file and is set in init_db().
+# cache_spill=OFF keeps dirty pages in memory until COMMIT during large batches.
+_CONN.execute("PRAGMA synchronous=NORMAL;")
+_CONN.execute("PRAGMA temp_store=MEMORY;")
+_CONN.execute("PRAGMA cache_size=-65536;")
+_CONN.execute("PRAGMA cache_spill=OFF;")
+
+# Messages waiting to be written by flush_messages()
+_pending = deque()
+_last_flush = time.monotonic()
+
+# message_length is a generated column, and a NULL timestamp falls back
+# to the local time in SQLite, so neither is computed in Python.
+# The COALESCE below is the only place that timestamp default lives.
+_INSERT_PREFIX = (
+    "INSERT INTO streamed_messages("
+    "message,author,timestamp,category,sentiment,keyword_mentioned"
+    ") VALUES "
+)
+_INSERT_COLUMNS = 6
+_ROW_PLACEHOLDERS = "(?,?,COALESCE(?,datetime('now','localtime')),?,?,?)"
+
+# Pulls the INSERT columns out of a complete message in one call, in column order
+_row_fields = operator.itemgetter(
+    "message", "author", "timestamp", "category", "sentiment", "keyword_mentioned"
+)
+
+# Bound parameters per statement are capped by SQLITE_LIMIT_VARIABLE_NUMBER
+# (default 999 before SQLite 3.32 and 32766 after, and builds can change it),
+# so ask the library instead of assuming
+_MAX_ROWS_PER_INSERT = _CONN.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // _INSERT_COLUMNS
+
+# Multi-row INSERT text, keyed by number of rows
+_bulk_sql_cache = {}
+
+# Position in the data file already copied into the database, and the
+# (st_dev, st_ino) and first bytes of the file that offset belongs to.
+# The first bytes catch a recreated file that reuses the old inode.
+_offset = 0
+_file_id = None
+_file_head = b""
+_FILE_HEAD_BYTES = 256
 
 
 #####################################
@@ -61,78 +134,154 @@ average_sentiment = []
 # - an axis (what they call a chart in Matplotlib)
 fig, ax = plt.subplots()
 
-# Use the ion() method (stands for "interactive on")
-# to turn on interactive mode for live updates
-plt.ion()
+# Live updates are driven by FuncAnimation in update_visualization(),
+# so interactive mode (plt.ion) is not needed.
+REFRESH_INTERVAL_MS = 2000
 
 
-def update_visualization(json_file):
+def read_new_messages(json_file):
     """
-    Create a bar chart visualization from the JSON file.
+    Return the messages appended to the JSON file since the last call.
+
+    A trailing line without a newline is still being written by the
+    producer, so it is left for the next call. If the file has been
+    replaced (new inode or different first bytes) or truncated,
+    reading restarts at 0.
 
     Args:
     - json_file (pathlib.Path): Path to the JSON file.
     """
-    logger.info(f"Creating visualization from {json_file}")
-    
-    import json
-import matplotlib.pyplot as plt
-from pathlib import Path
-from collections import defaultdict
-import logging
-import time
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-def update_visualization(json_file):
+    global _offset, _file_id, _file_head
+
+    messages = []
+
+    # Binary mode: offsets are plain byte counts and json.loads parses
+    # the bytes directly, without a separate UTF-8 decode pass.
+    # Lines are parsed as they are read, so only one raw line is held at a time.
+    with open(json_file, "rb") as file:
+        # The producer deletes and recreates the file on start; a different
+        # inode, a shorter file, or different first bytes means start over
+        stat = os.fstat(file.fileno())
+        file_id = (stat.st_dev, stat.st_ino)
+        head = file.read(len(_file_head))
+        if file_id != _file_id or stat.st_size < _offset or head != _file_head:
+            if _file_id is not None:
+                logger.info(f"{json_file} was truncated or recreated; reading from the start.")
+            _file_id = file_id
+            _file_head = b""
+            _offset = 0
+        file.seek(_offset)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            _offset += len(line)
+            if len(_file_head) < _FILE_HEAD_BYTES:
+                _file_head += line[:_FILE_HEAD_BYTES - len(_file_head)]
+            if line.strip():
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    # JSONDecodeError or UnicodeDecodeError (invalid UTF-8):
+                    # skip only the bad line; keep the messages already read
+                    logger.error(f"ERROR: Skipping malformed line in {json_file}: {e}")
+                    continue
+                if isinstance(message, dict):
+                    messages.append(message)
+                else:
+                    logger.error(f"ERROR: Skipping non-object line in {json_file}: {line!r}")
+
+    return messages
+
+
+def consume_messages(json_file, stop_event: threading.Event):
     """
-    Create a bar chart visualization from the JSON file.
+    Copy new lines from the JSON file into the database every
+    FLUSH_INTERVAL_SECS until stop_event is set, and flush anything
+    queued by process_message() on the same timer.
+    Runs in a background thread so the chart never parses JSON.
 
     Args:
     - json_file (pathlib.Path): Path to the JSON file.
+    - stop_event (threading.Event): Set to stop consuming.
     """
-    logger.info(f"Creating visualization from {json_file}")
-    
+    logger.info(f"Consuming messages from {json_file}")
+    while not stop_event.is_set():
+        # Bad lines are skipped in read_new_messages() and insert errors are
+        # handled in process_messages_bulk(). Nothing else watches this thread,
+        # so any other error is logged with its traceback and the loop goes on.
+        try:
+            process_messages(read_new_messages(json_file))
+            flush_messages()
+        except OSError as e:
+            logger.error(f"ERROR: Failed to read messages from {json_file}: {e}")
+        except Exception:
+            logger.exception(f"ERROR: Unexpected error consuming messages from {json_file}")
+        stop_event.wait(FLUSH_INTERVAL_SECS)
+
+
+def update_visualization():
+    """
+    Create a live bar chart of average sentiment by author.
+
+    Each frame only reads the per-author averages from the database
+    with a SQL GROUP BY; consume_messages() keeps the database current.
+    The chart reads through its own read-only connection, so with WAL it
+    sees only committed batches and never blocks the writer.
+    Each author gets one bar the first time they appear, after which
+    only its width changes, and FuncAnimation blits just the bars over
+    a cached background instead of clearing and redrawing the axis.
+    """
+    logger.info(f"Creating visualization from {DB_PATH}")
+
+    read_conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True)
+
+    # Sentiment is between 0 and 1, so the x axis never has to rescale
+    ax.set_xlim(0, 1)
+    ax.set_xlabel('Sentiment')
+    ax.set_ylabel('Authors')
+    ax.set_title('Sentiment Analysis of Messages')
+
+    # One bar per author, kept for the life of the chart
+    bars = {}
+
+    def update_frame(frame):
+        new_author = False
+        for author, _, avg_sentiment in read_author_sentiment(read_conn):
+            bar = bars.get(author)
+            if bar is None:
+                # Only a new author adds an artist; existing bars are reused
+                bar = Rectangle((0, len(bars) - 0.4), 0, 0.8, color='blue', animated=True)
+                ax.add_patch(bar)
+                bars[author] = bar
+                new_author = True
+            bar.set_width(avg_sentiment or 0)
+
+        if new_author:
+            # Redraw the static background once for the new tick label.
+            # Changing the y limits tells FuncAnimation to re-cache it.
+            ax.set_yticks(range(len(bars)), labels=list(bars))
+            ax.set_ylim(-0.5, len(bars) - 0.5)
+            fig.canvas.draw()
+
+        logger.info("Visualization updated successfully.")
+        return list(bars.values())
+
     try:
-        plt.ion()  # Turn on interactive mode
-        fig, ax = plt.subplots()
-        
-        while True:
-            with open(json_file, "r") as file:
-                data = [json.loads(line) for line in file]
-                
-                # Initialize message_count and sentiments
-                message_count = defaultdict(int)
-                sentiments = defaultdict(list)
-                
-                for msg in data:
-                    author = msg.get('author', 'Unknown')
-                    message_count[author] += 1
-                    sentiment = msg.get('sentiment', 0)
-                    sentiments[author].append(sentiment)
-                
-                average_sentiment = {author: sum(sentiments[author])/count 
-                                     for author, count in message_count.items()}
-                
-                # Update the plot
-                ax.clear()
-                authors = list(message_count.keys())
-                avg_sentiments = [average_sentiment[author] for author in authors]
-                
-                ax.barh(authors, avg_sentiments, color='blue')
-                ax.set_xlabel('Sentiment')
-                ax.set_ylabel('Authors')
-                ax.set_title('Sentiment Analysis of Messages')
-                
-                plt.draw()
-                plt.pause(2)
-                plt.gcf().canvas.flush_events()
-            
-            logger.info("Visualization updated successfully.")
+        # The GUI event loop schedules each frame; frames are generated
+        # forever, so don't cache them. Keep a reference to the animation
+        # so it isn't garbage collected while the window is open.
+        ani = animation.FuncAnimation(
+            fig,
+            update_frame,
+            interval=REFRESH_INTERVAL_MS,
+            blit=True,
+            cache_frame_data=False,
+        )
+        plt.show()
     except Exception as e:
         logger.error(f"ERROR: Failed to create visualization: {e}")
+    finally:
+        read_conn.close()
 
 #####################################
 # Define Function to Initialize SQLite Database
@@ -155,6 +304,9 @@ def init_db(db_path: pathlib.Path):
             cursor = conn.cursor()
             logger.info("SUCCESS: Got a cursor to execute SQL.")
 
+            # WAL persists in the database file; per-connection PRAGMAs are set on _CONN
+            cursor.execute("PRAGMA journal_mode=WAL;")
+
             cursor.execute("DROP TABLE IF EXISTS streamed_messages;")
 
             cursor.execute(
@@ -167,10 +319,16 @@ def init_db(db_path: pathlib.Path):
                     category TEXT,
                     sentiment REAL,
                     keyword_mentioned TEXT,
-                    message_length INTEGER
+                    message_length INTEGER GENERATED ALWAYS AS (length(message)) STORED
                 )
             """
             )
+
+            # Covers author and sentiment, so GROUP BY author reads only the index
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_msgs_author "
+                "ON streamed_messages(author, sentiment);"
+            )
             conn.commit()
         logger.info(f"SUCCESS: Database initialized and table ready at {db_path}.")
     except Exception as e:
@@ -182,84 +340,269 @@ def init_db(db_path: pathlib.Path):
 
 def read_message():
     """
-    Process a JSON message from a file.
+    Read the latest message from the live data file.
+
+    The producer appends one JSON object per line, so only the last
+    TAIL_BYTES of the file are read and the last complete line is parsed.
+    The window is doubled if that line is longer than the tail, and a
+    trailing line still being written is ignored. A file holding a JSON
+    array is still supported by parsing it whole.
     """
-    logger.info(f"Reading messages from {DATA_FILE}")
+    logger.info(f"Reading latest message from {DATA_FILE}")
     try:
-        with open(DATA_FILE, "r") as file:
-            data = json.load(file)
-            logger.info(f"Read data: {data}")
-
-            if isinstance(data, dict):
-                return data  # Return the message if it's a single dictionary
-            elif isinstance(data, list) and len(data) > 0:
-                return data[-1]  # Return the latest message if it's a list
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+        with open(DATA_FILE, "rb") as file:
+            if file.read(64).lstrip()[:1] == b"[":
+                # A single JSON array, not JSON Lines - parse it whole
+                file.seek(0)
+                data = json.loads(file.read())
+            else:
+                data = _read_last_line(file)
+        logger.info(f"Read data: {data}")
+
+        if isinstance(data, dict):
+            return data  # Return the message if it's a single dictionary
+        elif isinstance(data, list) and len(data) > 0:
+            return data[-1]  # Return the latest message if it's a list
+    except (ValueError, FileNotFoundError) as e:
         logger.error(f"Error reading message: {e}")
         return None
     return None
 
+
+def _read_last_line(file):
+    """
+    Parse the last complete line of a JSON Lines file, reading only
+    its tail. Returns None if the file has no complete line yet.
+
+    Args:
+    - file (BinaryIO): The data file, opened in binary mode.
+    """
+    size = os.fstat(file.fileno()).st_size
+    window = TAIL_BYTES
+    while True:
+        start = max(0, size - window)
+        file.seek(start)
+        tail = file.read(size - start)
+
+        # Drop a trailing line that is still being written; a file that is
+        # one line with no newline at all is taken as complete
+        end = tail.rfind(b"\n")
+        complete = tail[:end].rstrip() if end >= 0 else tail.strip()
+
+        # The last line is whole if it starts inside the window after a
+        # newline, or the window already reaches the start of the file
+        if b"\n" in complete or start == 0:
+            last_line = complete.rsplit(b"\n", 1)[-1]
+            return json.loads(last_line) if last_line else None
+        window *= 2
+
 #####################################
-# Define Function to Insert a Processed Message into the Database
+# Define Functions to Insert Processed Messages into the Database
 #####################################
 
-def process_message(message: dict):
+def _to_row(message: dict) -> tuple:
     """
-    Processes each message into the SQLite database.
+    Build the 6-tuple of column values for one message.
+    Complete messages are unpacked with a single itemgetter call;
+    messages missing a field fall back to per-field defaults.
 
     Args:
     - message (dict): Processed message to insert.
     """
+    try:
+        return _row_fields(message)
+    except KeyError:
+        pass
 
-    logger.info(f"Calling SQLite insert_message() with: {message=}")
-    logger.info(f"Database path: {DB_PATH}")
-
-    # Extract message details
     sentiment = message.get("sentiment", 0)
     category = message.get("category", "other")
-    timestamp = message.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    timestamp = message.get("timestamp")
     author = message.get("author", "Unknown")
     text = message.get("message", "")
     keyword_mentioned = message.get("keyword_mentioned", None)
-    message_length = len(text)
 
-    STR_PATH = str(DB_PATH)
-    
+    return (
+        text,
+        author,
+        timestamp,
+        category,
+        sentiment,
+        keyword_mentioned,
+    )
+
+
+def _bulk_insert_sql(rows: int) -> str:
+    """
+    Return a single INSERT statement with one VALUES group per row.
+    The text is cached per row count so each size is only built once.
+
+    Args:
+    - rows (int): Number of rows the statement inserts.
+    """
+    sql = _bulk_sql_cache.get(rows)
+    if sql is None:
+        sql = _INSERT_PREFIX + ",".join([_ROW_PLACEHOLDERS] * rows)
+        _bulk_sql_cache[rows] = sql
+    return sql
+
+
+def process_messages_bulk(rows: list[dict]):
+    """
+    Insert messages inside one transaction using multi-row
+    INSERT ... VALUES (...),(...) statements, so SQLite binds
+    many rows per statement instead of one.
+    If the batch fails, it is rolled back and retried one row at a time
+    so only the bad messages are skipped.
+
+    Args:
+    - rows (list[dict]): Processed messages to insert.
+    """
     try:
-        with sqlite3.connect(STR_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO streamed_messages (
-                    message, author, timestamp, category, sentiment, keyword_mentioned, message_length
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    text,
-                    author,
-                    timestamp,
-                    category,
-                    sentiment,
-                    keyword_mentioned,
-                    message_length,
-                ),
-            )
-            conn.commit()
-        logger.info("Inserted one message into the database.")
+        cursor = _CONN.cursor()
+        # IMMEDIATE takes the write lock up front instead of upgrading
+        # a read lock mid-transaction, which can fail with SQLITE_BUSY
+        _CONN.execute("BEGIN IMMEDIATE")
+        for start in range(0, len(rows), _MAX_ROWS_PER_INSERT):
+            chunk = rows[start:start + _MAX_ROWS_PER_INSERT]
+            flat = [value for message in chunk for value in _to_row(message)]
+            cursor.execute(_bulk_insert_sql(len(chunk)), flat)
+        _CONN.execute("COMMIT")
+        logger.info(f"Inserted {len(rows)} messages into the database.")
     except Exception as e:
-        logger.error(f"ERROR: Failed to insert message into the database: {e}")
+        if _CONN.in_transaction:
+            _CONN.execute("ROLLBACK")
+        logger.warning(f"WARNING: Batch insert failed ({e}); retrying one message at a time.")
+        _insert_one_at_a_time(rows)
+
+
+def _insert_one_at_a_time(rows: list[dict]):
+    """
+    Insert messages one row per statement inside one transaction,
+    logging and skipping any message that cannot be inserted.
+
+    Args:
+    - rows (list[dict]): Processed messages to insert.
+    """
+    inserted = 0
+    try:
+        cursor = _CONN.cursor()
+        _CONN.execute("BEGIN IMMEDIATE")
+        for message in rows:
+            try:
+                cursor.execute(_bulk_insert_sql(1), _to_row(message))
+                inserted += 1
+            except Exception as e:
+                logger.error(f"ERROR: Skipping message that failed to insert: {e}: {message!r}")
+        _CONN.execute("COMMIT")
+        logger.info(f"Inserted {inserted} of {len(rows)} messages into the database.")
+    except Exception as e:
+        if _CONN.in_transaction:
+            _CONN.execute("ROLLBACK")
+        logger.error(f"ERROR: Failed to insert messages into the database: {e}")
+
+
+def process_messages(messages: list[dict]):
+    """
+    Insert a batch of messages into the SQLite database,
+    committing once per BATCH_SIZE messages.
+
+    Args:
+    - messages (list[dict]): Processed messages to insert.
+    """
+    for start in range(0, len(messages), BATCH_SIZE):
+        process_messages_bulk(messages[start:start + BATCH_SIZE])
+
+
+def flush_messages():
+    """
+    Insert all queued messages into the SQLite database.
+    """
+    global _last_flush
+
+    if _pending:
+        # popleft() is atomic, so a message queued by another thread
+        # during the drain is kept for the next flush, not lost
+        batch = [_pending.popleft() for _ in range(len(_pending))]
+        process_messages(batch)
+    _last_flush = time.monotonic()
+
+
+def process_message(message: dict):
+    """
+    Queue a single message for the database.
+    The queue is flushed once it holds BATCH_SIZE messages
+    or FLUSH_INTERVAL_SECS have passed since the last flush.
+    consume_messages() also flushes it on every tick, so messages
+    on a quiet stream are not left queued.
+
+    Args:
+    - message (dict): Processed message to insert.
+    """
+    _pending.append(message)
+    if (
+        len(_pending) >= BATCH_SIZE
+        or time.monotonic() - _last_flush >= FLUSH_INTERVAL_SECS
+    ):
+        flush_messages()
+
+
+#####################################
+# Define Function to Aggregate Messages in the Database
+#####################################
+
+def read_author_sentiment(conn: sqlite3.Connection) -> list[tuple]:
+    """
+    Return (author, message_count, average_sentiment) for each author,
+    aggregated by SQLite instead of in Python.
+
+    Args:
+    - conn (sqlite3.Connection): Connection to read from, separate from
+      the shared connection used for inserts.
+    """
+    try:
+        return conn.execute(
+            """
+            SELECT author, COUNT(*), AVG(sentiment)
+            FROM streamed_messages
+            GROUP BY author
+        """
+        ).fetchall()
+    except Exception as e:
+        logger.error(f"ERROR: Failed to read sentiment by author: {e}")
+        return []
+
+
+def close_db():
+    """
+    Flush any queued messages and close the shared connection.
+    Registered with atexit so queued messages are not lost on exit.
+    """
+    flush_messages()
+    _CONN.close()
+
+
+atexit.register(close_db)
 
 # Example usage
 if __name__ == "__main__":
     # Initialize the database
     init_db(DB_PATH)
     
-    # Process the latest message
+    # Show the latest message; consume_messages() loads the whole file into the database
     message = read_message()
     if message:
-        logger.info(f"Message to be processed: {message}")
-        process_message(message)
+        logger.info(f"Latest message: {message}")
     else:
         logger.error("No message found to process.")
 
-    update_visualization(DATA_FILE)
+    # Consume in the background while the chart runs in the main thread
+    stop_event = threading.Event()
+    consumer = threading.Thread(
+        target=consume_messages, args=(DATA_FILE, stop_event), daemon=True
+    )
+    consumer.start()
+    try:
+        update_visualization()
+    finally:
+        stop_event.set()
+        consumer.join()
@@ -174,19 +174,21 @@ def main() -> None:
 
     logger.info("STEP 5. Generate messages continuously.")
     try:
-        for message in generate_messages():
-            logger.info(message)
+        # Open the live data file once and write JSON Lines (one object per line).
+        # Line buffering makes each message visible to consumers as soon as it is written.
+        with live_data_path.open("a", buffering=1) as f:
+            for message in generate_messages():
+                logger.info(message)
 
-            with live_data_path.open("a") as f:
                 f.write(json.dumps(message) + "\n")
                 logger.info(f"STEP 4a Wrote message to file: {message}")
 
-            # Send to Kafka if available
-            if producer:
-                producer.send(topic, value=message)
-                logger.info(f"STEP 4b Sent message to Kafka topic '{topic}': {message}")
+                # Send to Kafka if available
+                if producer:
+                    producer.send(topic, value=message)
+                    logger.info(f"STEP 4b Sent message to Kafka topic '{topic}': {message}")
 
-            time.sleep(interval_secs)
+                time.sleep(interval_secs)
 
     except KeyboardInterrupt:
         logger.warning("WARNING: Producer interrupted by user.")